@@ -3,11 +3,30 @@
 import pandas as pd
 from pathlib import Path
 
+try:
+    import pyarrow as pa  # optional: hash dedup
+except ImportError:
+    pa = None
+
 INPUT = Path("ai_wayback_panel_tool_day.final.csv")
 OUTPUT = Path("ai_wayback_panel_tool_day.final.csv")
 
+def drop_duplicate_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Exact-row dedup keeping the first occurrence, via Arrow's hash group-by when available."""
+    if pa is None:
+        return df.drop_duplicates()
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return df.drop_duplicates()
+
+    # single-threaded group_by emits groups in first-seen order, like keep="first"
+    unique = table.group_by(table.column_names, use_threads=False).aggregate([])
+    return unique.select(table.column_names).to_pandas()
+
 def main():
     print("🔹 Reading file...")
+    # C parser: pandas' pyarrow engine cannot read the panel's quoted newlines
     df = pd.read_csv(
         INPUT,
         encoding="utf-8",
@@ -16,11 +35,13 @@ def main():
     print(f"🔹 Rows before cleanup: {len(df):,}")
 
     # ----- PERFECT ROW DEDUP -----
-    df = df.drop_duplicates()
+    df = drop_duplicate_rows(df)
 
     print(f"🔹 Rows after dedup: {len(df):,}")
 
     # ----- STABLE SORT -----
+    # category codes are assigned in sorted order, so the sort compares ints, not strings
+    df["tool_name"] = df["tool_name"].astype("category")
     df = df.sort_values(
         by=["tool_name", "snapshot_day"],
         kind="stable",
@@ -1,13 +1,48 @@
 #!/usr/bin/env python3
 
+import numpy as np
 import pandas as pd
+import csv
 import json
+import math
+import os
 import re
+from collections import deque
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from tqdm import tqdm
 from urllib.parse import urlparse, urlunparse
 
-WAYBACK_RE = re.compile(r"/web/\d{14}/")
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: falls back to pandas' C parser
+    pa = None
+
+try:
+    from orjson import loads as json_loads  # SIMD JSON decoder, same Python objects out
+except ImportError:
+    json_loads = json.loads
+
+READ_BLOCK_SIZE = 16 << 20  # bytes per Arrow streaming batch
+WRITE_BUFFER = 1 << 20  # one write() per MiB of CSV instead of per 8 KiB
+# pandas' default NA strings; Arrow's own list lacks "None" and "<NA>"
+NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+# Wayback capture URLs look like .../web/<14-digit timestamp>/<original URL>.
+# Kept as two patterns: the timestamp is read from the page link even when no
+# http(s) URL follows it, while unwrapping needs the first wrapped URL.
+WAYBACK_TS_RE = re.compile(r"/web/(?P<ts>[0-9]{14})/")
+WAYBACK_ANY_RE = re.compile(r"/web/\d{14}/(?P<url>https?://.+)")
 
 FINAL_COLUMNS = [
     "tool_id",
@@ -25,43 +60,131 @@ FINAL_COLUMNS = [
     "source",
 ]
 
+CHUNKSIZE = 20_000  # rows per pandas chunk, roughly one Arrow batch; amortises worker IPC
+WORKERS = os.cpu_count() or 1
+
+# Duplicate (tool_id, snapshot_day) rows keep the highest views, then saves, then rating
+DEDUP_COLUMNS = ["tool_id", "snapshot_day"]
+RANK_COLUMNS = ["views", "saves", "rating"]
+CHECKPOINT_EVERY = 10  # chunks (~20k rows / 16 MiB each) between intermediate panel saves
+
 
 # ----------------------------
 # Helpers
 # ----------------------------
-WAYBACK_ANY_RE = re.compile(r"/web/\d{14}/(https?://.+)")
-
 def unwrap_wayback(url: str | None) -> str | None:
     if not isinstance(url, str):
         return None
 
     m = WAYBACK_ANY_RE.search(url)
     if m:
-        return m.group(1)
+        return m["url"]
 
     return url
 
-WAYBACK_TS_RE = re.compile(r"/web/(\d{14})/")
-
-def extract_snapshot_from_url(*urls):
-    for url in urls:
-        if not isinstance(url, str):
-            continue
-        m = WAYBACK_TS_RE.search(url)
-        if m:
-            ts = m.group(1)
-            snapshot_day = ts[:8]
-            date = pd.to_datetime(snapshot_day, format="%Y%m%d").date().isoformat()
-            return snapshot_day, date
-    return None, None
-
-def extract_comments_count(row):
-    for key in ("comments_count", "number_of_comments"):
-        val = row.get(key)
-        if pd.notna(val):
-            return val
-    return None
-
+def wayback_timestamps(values: pd.Series) -> pd.Series:
+    """
+    The /web/<timestamp>/ of each cell, NA where there is none.
+    With pyarrow the scan runs in Arrow's RE2 kernel; pandas' .str.extract
+    would call re.search once per cell from Python.
+    """
+    values = values.astype("string")
+    if pa is None:
+        return values.str.extract(WAYBACK_TS_RE.pattern, expand=False)
+
+    found = pc.extract_regex(pa.array(values, type=pa.string()), WAYBACK_TS_RE.pattern)
+    return pd.Series(pc.struct_field(found, [0]), index=values.index, dtype="string")
+
+def add_snapshot_columns(df: pd.DataFrame, *url_columns: str) -> pd.DataFrame:
+    """
+    Vectorised snapshot extraction for a whole chunk.
+    Adds `_snapshot_day` (YYYYMMDD) and `_date` (YYYY-MM-DD) taken from the
+    first of `url_columns` that carries a Wayback timestamp.
+    """
+    ts = pd.Series(pd.NA, index=df.index, dtype="string")
+    for col in url_columns:
+        if col in df.columns:
+            ts = ts.fillna(wayback_timestamps(df[col]))
+
+    day = ts.str[:8].astype(object)
+    present = day.notna()
+
+    # A file only spans a few hundred distinct days: format each one once
+    iso = {d: f"{d[:4]}-{d[4:6]}-{d[6:8]}" for d in day[present].unique()}
+
+    df["_snapshot_day"] = day.where(present, None)
+    df["_date"] = day.map(iso).where(present, None)
+    return df
+
+def column_arrays(
+    df: pd.DataFrame, *names: str, json_columns: tuple[str, ...] = ()
+) -> list:
+    """
+    One object array per column, None-filled when the column is absent.
+    Missing cells are mapped to None here with one vectorised mask per column,
+    so the row loops can test `is None` instead of calling pd.isna per value.
+    Columns listed in `json_columns` come back already decoded (see parse_json_column).
+    """
+    arrays = []
+    for name in names:
+        if name in df.columns:
+            values = df[name].to_numpy(dtype=object, na_value=None)
+        else:
+            values = np.full(len(df), None, dtype=object)
+        if name in json_columns:
+            values = parse_json_column(values)
+        arrays.append(values)
+    return arrays
+
+def csv_header(path: Path) -> list[str]:
+    # utf-8-sig: a BOM must not end up in the first column name (Arrow skips it)
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return next(csv.reader(fh), [])
+
+def read_chunks(path: Path, chunksize: int = CHUNKSIZE, columns=None):
+    """
+    Yield `path` as DataFrame chunks, parsing only `columns` when given.
+    With pyarrow the batches come from Arrow's multithreaded streaming reader
+    (READ_BLOCK_SIZE bytes each, `chunksize` unused); otherwise from pandas'
+    chunked C parser, `chunksize` rows at a time.
+    Arrow fixes column types from the first batch, so every column is read
+    as text (on both paths, skipping pandas' type inference);
+    build_rows' safe_int / safe_float do the numeric coercion.
+    A file Arrow rejects part-way (e.g. a short row, which pandas pads with
+    NaN) is finished by pandas, starting after the rows already yielded.
+    """
+    done = 0
+    if pa is not None:
+        names = [name for name in csv_header(path) if columns is None or name in columns]
+        try:
+            reader = pacsv.open_csv(
+                path,
+                read_options=pacsv.ReadOptions(block_size=READ_BLOCK_SIZE),
+                # scraped text (pricing, names) can hold quoted newlines; without
+                # this a value spanning a block boundary aborts the whole file
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=names,
+                    column_types={name: pa.string() for name in names},
+                    null_values=NA_VALUES,
+                    strings_can_be_null=True,
+                ),
+            )
+            for batch in reader:
+                chunk = batch.to_pandas()
+                done += len(chunk)
+                yield chunk
+            return
+        except pa.ArrowInvalid as exc:
+            tqdm.write(f"{path}: {exc}; reading the rest with pandas")
+
+    usecols = None if columns is None else (lambda name: name in columns)
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=usecols, dtype=str):
+        if done < len(chunk):
+            yield chunk.iloc[done:] if done else chunk
+        done = max(done - len(chunk), 0)
+
+@lru_cache(maxsize=200_000)
 def normalize_url(url: str | None) -> str | None:
     url = unwrap_wayback(url)
     if not isinstance(url, str) or not url.strip():
@@ -80,16 +203,62 @@ def normalize_url(url: str | None) -> str | None:
         )
     )
 
-def compute_tool_id(internal_link, external_link):
-    internal = normalize_url(internal_link)
-    if internal:
-        return internal
-    return normalize_url(external_link)
+# scheme, host, path of a plain http(s) URL whose urlparse split is unambiguous:
+# host without brackets, no ;params, no tab/CR/LF. RE2-compatible for Arrow.
+URL_PARTS_RE = re.compile(
+    r'^(?P<scheme>[Hh][Tt][Tt][Pp][Ss]?)://(?P<host>[!-"$-.0->@-Z\\^-~]+)'
+    r"(?P<path>(?:/[^?#;\t\r\n]*)?)(?:[?#][^\t\r\n]*)?$"
+)
+
+def normalize_urls(values) -> np.ndarray:
+    """
+    normalize_url over a whole column.
+    Wayback unwrapping, the scheme/host/path split and the lower-casing run as
+    column kernels (Arrow compute, else pandas .str) over the distinct values;
+    values URL_PARTS_RE does not cover go through (cached) normalize_url,
+    so results are identical.
+    """
+    # Links repeat heavily across rows and snapshots: work on each distinct one once
+    codes, values = pd.factorize(
+        np.array([v if isinstance(v, str) else None for v in values], dtype=object)
+    )
+
+    if pa is not None:
+        arr = pa.array(values, type=pa.string())
+        url = pc.coalesce(pc.struct_field(pc.extract_regex(arr, WAYBACK_ANY_RE.pattern), [0]), arr)
+        parts = pc.extract_regex(url, URL_PARTS_RE.pattern)
+        # RE2's \d and case folding are ASCII-only: leave anything else to urlparse
+        fast = pc.fill_null(pc.and_(pc.is_valid(parts), pc.string_is_ascii(arr)), False)
+        joined = pc.binary_join_element_wise(
+            pc.utf8_lower(pc.struct_field(parts, [0])),
+            "://",
+            pc.utf8_lower(pc.struct_field(parts, [1])),
+            pc.utf8_rtrim(pc.struct_field(parts, [2]), characters="/"),
+            "",
+        )
+        out = pc.if_else(fast, joined, None).to_numpy(zero_copy_only=False)
+        slow = ~fast.to_numpy(zero_copy_only=False)
+    else:
+        s = pd.Series(values, dtype=object)
+        url = s.str.extract(WAYBACK_ANY_RE.pattern, expand=False).fillna(s)
+        parts = url.str.extract(URL_PARTS_RE.pattern)
+        joined = parts["scheme"].str.lower() + "://" + parts["host"].str.lower() + parts["path"].str.rstrip("/")
+        out = joined.to_numpy(dtype=object, na_value=None)
+        slow = parts["scheme"].isna().to_numpy()
+
+    for i in np.flatnonzero(slow):
+        out[i] = normalize_url(values[i])
+    return np.append(out, None)[codes]  # missing cells are code -1: the trailing None
+
 
 
+def _isna(v) -> bool:
+    """pd.isna for the scalars rows hold (None / float NaN), minus pandas' type dispatch."""
+    return v is None or (isinstance(v, float) and v != v)
+
 
 def safe_int(v):
-    if pd.isna(v):
+    if _isna(v):
         return None
     try:
         return int(v)
@@ -103,302 +272,484 @@ def safe_int(v):
 
 def safe_float(v):
     try:
-        if pd.isna(v):
+        if _isna(v):
             return None
-        return float(v)
+        f = float(v)
+        return None if f != f else f  # "NaN" text: an empty cell, not "nan"
     except Exception:
         return None
 
 
+def coerce_column(values, convert) -> np.ndarray:
+    """
+    convert (safe_int / safe_float) over a whole column.
+    Counts and ratings take few distinct values, so after one factorize pass
+    each distinct cell is converted once; missing cells come out as None.
+    """
+    codes, uniques = pd.factorize(
+        np.array([None if isinstance(v, (list, dict)) else v for v in values], dtype=object)
+    )
+    converted = np.array([convert(v) for v in uniques] + [None], dtype=object)
+    return converted[codes]  # missing cells are code -1: the trailing None
+
+
 def parse_json(v):
     if not isinstance(v, str) or not v.strip():
         return []
     try:
+        return json_loads(v)
+    except json.JSONDecodeError:  # orjson's error subclasses it
+        pass
+    except Exception:
+        return []
+    try:
+        # orjson rejects the bare NaN / Infinity literals json.dumps writes by default
         return json.loads(v)
     except Exception:
         return []
 
 
+def parse_json_column(values) -> list:
+    """
+    parse_json over a whole column at once.
+    Each distinct payload is decoded a single time; repeated cells
+    (empty lists, the same listing page across snapshots) share the result.
+    """
+    decoded = {v: parse_json(v) for v in set(values) if isinstance(v, str)}
+    return [decoded[v] if isinstance(v, str) else [] for v in values]
+
+
+def version_day(d: str) -> str | None:
+    """
+    Calendar day (YYYY-MM-DD) of one version date.
+    ISO 8601 strings go through the C datetime.fromisoformat; only other
+    spellings ("May 1, 2023", "2023/05/01") pay for pd.to_datetime.
+    """
+    try:
+        return datetime.fromisoformat(d).date().isoformat()
+    except ValueError:
+        pass
+    try:
+        ts = pd.to_datetime(d)
+    except Exception:
+        return None
+    return None if pd.isna(ts) else ts.date().isoformat()
+
+
+@lru_cache(maxsize=50_000)
 def extract_release_date(versions_json):
-    dates = []
-    for item in parse_json(versions_json):
-        d = item.get("date")
+    # Cached on the raw cell: a tool's versions list repeats across snapshots.
+    # ISO days order lexicographically, so min() needs no Timestamp objects
+    versions = parse_json(versions_json)
+    if not isinstance(versions, list):  # "null", "{}", a bare number
+        return None
+
+    days = []
+    for item in versions:
+        d = item.get("date") if isinstance(item, dict) else None
         if isinstance(d, str):
-            try:
-                dates.append(pd.to_datetime(d))
-            except Exception:
-                pass
-    return min(dates).date().isoformat() if dates else None
+            day = version_day(d)
+            if day:
+                days.append(day)
+    return min(days) if days else None
 
 
 # ----------------------------
 # Row builder
 # ----------------------------
 
-def build_row(
-    *,
-    tool_name,
-    internal_link,
-    external_link,
-    pricing_text,
-    views,
-    saves,
-    comments_count,
-    rating,
-    versions,
-    snapshot_day,
-    date,
-    source,
-):
-    tool_id = compute_tool_id(internal_link, external_link)
-    if not tool_id:
-        return None
+ROW_FIELDS = (
+    "tool_name",
+    "internal_link",
+    "external_link",
+    "pricing_text",
+    "views",
+    "saves",
+    "comments_count",
+    "rating",
+    "versions",
+)
+
+def build_rows(candidates: list[tuple], source: str) -> list[tuple]:
+    """
+    Turn (snapshot_day, date, *ROW_FIELDS) candidates into FINAL_COLUMNS tuples.
+    Links and numbers are converted a whole column at a time; candidates that
+    end up without a tool_id (internal link, else external link) are dropped.
+    """
+    if not candidates:
+        return []
 
-    return {
-        "tool_id": tool_id,
-        "tool_name": tool_name,
-        "snapshot_day": snapshot_day,
-        "date": date,
-        "release_date": extract_release_date(versions),
-        "internal_link": normalize_url(internal_link),
-        "external_link": normalize_url(external_link),
-        "pricing_text": pricing_text if isinstance(pricing_text, str) else None,
-        "views": safe_int(views),
-        "saves": safe_int(saves),
-        "comments_count": safe_int(comments_count),
-        "rating": safe_float(rating),
-        "source": source,
-    }
+    (
+        snapshot_days, dates, tool_names, internal_links, external_links,
+        pricing_texts, views, saves, comments_counts, ratings, versions,
+    ) = zip(*candidates)
+
+    internal = normalize_urls(internal_links)
+    external = normalize_urls(external_links)
+    tool_ids = np.where(np.equal(internal, None) | np.equal(internal, ""), external, internal)
+    keep = np.flatnonzero(~(np.equal(tool_ids, None) | np.equal(tool_ids, "")))
+
+    def kept(values) -> np.ndarray:
+        return np.fromiter(values, dtype=object, count=len(values))[keep]
+
+    tool_names = kept(tool_names)
+    pricing_texts = kept(pricing_texts)
+
+    # Columns are assembled whole and transposed once into FINAL_COLUMNS-ordered
+    # tuples (what the panel dict stores): no per-row dict or tuple display
+    return list(zip(
+        tool_ids[keep],
+        np.where(pd.isna(tool_names), None, tool_names),
+        kept(snapshot_days),
+        kept(dates),
+        [None if not v or v == "[]" else extract_release_date(v) for v in kept(versions)],
+        internal[keep],
+        external[keep],
+        np.where([isinstance(p, str) for p in pricing_texts], pricing_texts, None),
+        coerce_column(kept(views), safe_int),
+        coerce_column(kept(saves), safe_int),
+        coerce_column(kept(comments_counts), safe_int),
+        coerce_column(kept(ratings), safe_float),
+        repeat(source, len(keep)),
+    ))
 
 
 # ----------------------------
-# Main processor
+# Panel
 # ----------------------------
-def process_csv_2024(path: Path, source: str) -> list[dict]:
-    df = pd.read_csv(path)
-    out = []
 
-    for _, r in tqdm(df.iterrows(), total=len(df), desc=path.name):
-        snapshot_day, date = extract_snapshot_from_url(
-            r.get("link"),
-            r.get("tool_link"),
-        )
+_dedup_fields = itemgetter(*(FINAL_COLUMNS.index(c) for c in DEDUP_COLUMNS))
+_rank_fields = itemgetter(*(FINAL_COLUMNS.index(c) for c in RANK_COLUMNS))
+
+def rank(row: tuple) -> tuple:
+    """Same order as sort_values(RANK_COLUMNS, ascending=False, na_position="last")."""
+    return tuple(-math.inf if _isna(v) else v for v in _rank_fields(row))
+
+def merge_into_panel(panel: dict, rows):
+    """
+    Keep the best-ranked row per (tool_id, snapshot_day); on ties the earlier row wins.
+    Missing key parts all collapse to None, as drop_duplicates treats NaN/None alike.
+    """
+    for row in rows:
+        key = tuple(None if _isna(v) else v for v in _dedup_fields(row))
+        r = rank(row)
+        kept = panel.get(key)
+        if kept is None or r > kept[0]:
+            panel[key] = (r, row)
+
+def load_panel(path: Path) -> dict:
+    panel = {}
+    # Every column as text, coerced like build_rows does, so rows from disk
+    # carry the types of fresh rows: "YYYYMMDD" keys collide with incoming
+    # rows, and counts stay ints instead of coming back as floats
+    df = pd.read_csv(path, usecols=FINAL_COLUMNS, dtype=str)
+    # panels written through a float column hold "20240115.0"
+    df["snapshot_day"] = df["snapshot_day"].str.removesuffix(".0")
+    numbers = {"views": safe_int, "saves": safe_int, "comments_count": safe_int, "rating": safe_float}
+    columns = [
+        coerce_column(values, numbers[name]) if name in numbers else values
+        for name, values in zip(FINAL_COLUMNS, column_arrays(df, *FINAL_COLUMNS))
+    ]
+    merge_into_panel(panel, zip(*columns))
+    return panel
+
+def panel_rows(panel: dict) -> list[tuple]:
+    """Panel rows best-ranked first (sorted() is stable with reverse=True)."""
+    return [row for _, row in sorted(panel.values(), key=itemgetter(0), reverse=True)]
 
-        # 1️⃣ Main tool row (the page itself)
-        main_row = build_row(
-            tool_name=r.get("name"),
-            internal_link=r.get("link"),
-            external_link=r.get("tool_link"),
-            pricing_text=r.get("pricing_model"),
-            views=None,                     # NOT AVAILABLE IN 2024
-            saves=r.get("saves"),
-            comments_count=extract_comments_count(r),
-            rating=r.get("rating"),
-            versions=r.get("versions"),
-            snapshot_day=snapshot_day,
-            date=date,
-            source=source,
-        )
 
-        if main_row:
-            out.append(main_row)
-
-        # 2️⃣ Expand tools_json
-        for item in parse_json(r.get("tools_json")):
-            tool_row = build_row(
-                tool_name=item.get("name"),
-                internal_link=item.get("tool_link"),
-                external_link=item.get("external_link"),
-                pricing_text=item.get("pricing"),
-                views=None,                  # NOT AVAILABLE
-                saves=item.get("saves"),
-                comments_count=None,
-                rating=item.get("average_rating"),
-                versions=None,
-                snapshot_day=snapshot_day,
-                date=date,
-                source=source,
-            )
+# ----------------------------
+# Output
+# ----------------------------
 
-            if tool_row:
-                out.append(tool_row)
+def write_panel(rows: list[tuple], path: Path):
+    """
+    Serialise FINAL_COLUMNS-ordered row tuples straight to CSV (C `_csv` writer).
+    Lines end in "\n" as DataFrame.to_csv wrote them. Counts are written as
+    the ints they are ("20"), where to_csv wrote "20.0" for a column with gaps.
+    The file is written next to `path` and swapped in with os.replace, so a run
+    killed mid-checkpoint leaves the previous panel intact, never a truncated one.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", buffering=WRITE_BUFFER, newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh, lineterminator="\n")
+        writer.writerow(FINAL_COLUMNS)
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+class BackgroundWriter:
+    """
+    Double-buffered panel persistence: writes run on one worker thread so the
+    next chunk is transformed while the previous panel is still hitting disk.
+    At most one write is in flight; submit() reaps it before queueing another.
+    """
+
+    def __init__(self):
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def submit(self, fn, *args):
+        self.wait()
+        self._pending = self._pool.submit(fn, *args)
+
+    def wait(self):
+        if self._pending is not None:
+            pending, self._pending = self._pending, None
+            pending.result()
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            self._pool.shutdown()
 
-    return out
-def process_csv_2023(path: Path, source: str) -> list[dict]:
-    out = []
+    def __enter__(self):
+        return self
 
-    for chunk in pd.read_csv(path, chunksize=200):
-        for _, r in chunk.iterrows():
-            snapshot_day, date = extract_snapshot_from_url(r.get("link"))
-
-            for item in parse_json(r.get("listings_json")):
-                row = build_row(
-                    tool_name=item.get("name"),
-                    internal_link=item.get("internal_link"),
-                    external_link=item.get("external_link"),
-                    pricing_text=item.get("price_label") or item.get("pricing_text"),
-                    views=None,                    # NOT AVAILABLE
-                    saves=item.get("saves"),
-                    comments_count=None,
-                    rating=item.get("rating"),
-                    versions=None,
-                    snapshot_day=snapshot_day,
-                    date=date,
-                    source=source,
-                )
+    def __exit__(self, *exc):
+        self.close()
 
-                if row:
-                    out.append(row)
 
-        yield out
-        out = []
+# ----------------------------
+# Source layouts
+# ----------------------------
 
-def append_2024_to_panel_streaming(
-    panel_path: Path,
-    csv_2024: Path,
-    chunksize: int = 200
-):
-    # Load existing panel ONCE
-    panel = pd.read_csv(panel_path)
+@dataclass(frozen=True)
+class CsvMapping:
+    """
+    How one scraped CSV layout maps onto ROW_FIELDS.
+
+    Each field lists candidate source names; the first one holding a value
+    (not None / "") wins. `row_fields` describes the page's own tool row
+    (None when the CSV has none); `item_fields` applies to every element of
+    the lists stored in `json_columns`.
+    """
+
+    snapshot_columns: tuple[str, ...]
+    row_fields: dict[str, tuple[str, ...]] | None
+    json_columns: tuple[str, ...]
+    item_fields: dict[str, tuple[str, ...]]
+
+    @property
+    def columns(self) -> frozenset[str]:
+        """Every source column the layout reads; read_chunks parses only these."""
+        row_columns = [c for names in (self.row_fields or {}).values() for c in names]
+        return frozenset((*self.snapshot_columns, *row_columns, *self.json_columns))
+
+MAPPING_2024 = CsvMapping(
+    snapshot_columns=("link", "tool_link"),
+    row_fields={                               # views NOT AVAILABLE IN 2024
+        "tool_name": ("name",),
+        "internal_link": ("link",),
+        "external_link": ("tool_link",),
+        "pricing_text": ("pricing_model",),
+        "saves": ("saves",),
+        "comments_count": ("comments_count", "number_of_comments"),
+        "rating": ("rating",),
+        "versions": ("versions",),
+    },
+    json_columns=("tools_json",),
+    item_fields={
+        "tool_name": ("name",),
+        "internal_link": ("tool_link",),
+        "external_link": ("external_link",),
+        "pricing_text": ("pricing",),
+        "saves": ("saves",),
+        "rating": ("average_rating",),
+    },
+)
+
+MAPPING_2023 = CsvMapping(
+    snapshot_columns=("link",),
+    row_fields=None,                           # listing pages only
+    json_columns=("listings_json",),
+    item_fields={
+        "tool_name": ("name",),
+        "internal_link": ("internal_link",),
+        "external_link": ("external_link",),
+        "pricing_text": ("price_label", "pricing_text"),
+        "saves": ("saves",),
+        "rating": ("rating",),
+    },
+)
+
+MAPPING_DEFAULT = CsvMapping(
+    snapshot_columns=("link", "internal_link", "tool_link", "external_link"),
+    row_fields={
+        "tool_name": ("name", "tool_name"),
+        "internal_link": ("link", "internal_link"),
+        "external_link": ("tool_link", "external_link"),
+        "pricing_text": ("pricing_model", "price_text", "pricing_text"),
+        "views": ("views",),
+        "saves": ("saves",),
+        "comments_count": ("comments_count", "number_of_comments"),
+        "rating": ("rating",),
+        "versions": ("versions",),
+    },
+    json_columns=("top_alternative_json", "featured_items_json"),
+    item_fields={
+        "tool_name": ("name", "data_name"),
+        "internal_link": ("ai_page",),
+        "external_link": ("external_url", "data_url"),
+        "pricing_text": ("pricing", "price_text"),
+        "views": ("views",),
+        "saves": ("saves",),
+        "rating": ("rating",),
+    },
+)
+
+
+def coalesce(arrays: list) -> np.ndarray:
+    """Element-wise first value across `arrays` that is neither None nor ""."""
+    out = np.array(arrays[0], dtype=object)
+    for other in arrays[1:]:
+        missing = np.equal(out, None) | np.equal(out, "")
+        out[missing] = other[missing]
+    return out
 
-    header_written = False
+def pick(item: dict, keys: tuple[str, ...]):
+    for key in keys:
+        val = item.get(key)
+        if val is not None and val != "":
+            return val
+    return None
 
-    for chunk in pd.read_csv(csv_2024, chunksize=chunksize):
-        out = []
 
-        for _, r in chunk.iterrows():
-            snapshot_day, date = extract_snapshot_from_url(
-                r.get("link"),
-                r.get("tool_link"),
-            )
+# ----------------------------
+# Chunk transform (runs in worker processes)
+# ----------------------------
+def chunk_rows(chunk: pd.DataFrame, mapping: CsvMapping, source: str) -> list[tuple]:
+    candidates = []
 
-            # Main row
-            main_row = build_row(
-                tool_name=r.get("name"),
-                internal_link=r.get("link"),
-                external_link=r.get("tool_link"),
-                pricing_text=r.get("pricing_model"),
-                views=None,
-                saves=r.get("saves"),
-                comments_count=extract_comments_count(r),
-                rating=r.get("rating"),
-                versions=r.get("versions"),
-                snapshot_day=snapshot_day,
-                date=date,
-                source="2024",
-            )
-            if main_row:
-                out.append(main_row)
-
-            # tools_json explosion
-            for item in parse_json(r.get("tools_json")):
-                tool_row = build_row(
-                    tool_name=item.get("name"),
-                    internal_link=item.get("tool_link"),
-                    external_link=item.get("external_link"),
-                    pricing_text=item.get("pricing"),
-                    views=None,
-                    saves=item.get("saves"),
-                    comments_count=None,
-                    rating=item.get("average_rating"),
-                    versions=None,
-                    snapshot_day=snapshot_day,
-                    date=date,
-                    source="2024",
-                )
-                if tool_row:
-                    out.append(tool_row)
+    add_snapshot_columns(chunk, *mapping.snapshot_columns)
+    snapshot_days, dates, *payloads = column_arrays(
+        chunk, "_snapshot_day", "_date", *mapping.json_columns,
+        json_columns=mapping.json_columns,
+    )
 
-        if not out:
-            continue
+    # Resolve every main-row field to one column up front
+    if mapping.row_fields is not None:
+        none = np.full(len(chunk), None, dtype=object)
+        resolved = [
+            coalesce(column_arrays(chunk, *mapping.row_fields[f]))
+            if f in mapping.row_fields else none
+            for f in ROW_FIELDS
+        ]
+        main_rows = zip(*resolved)
+    else:
+        main_rows = None
+
+    item_keys = [mapping.item_fields.get(f, ()) for f in ROW_FIELDS]
+
+    for i, (snapshot_day, date) in enumerate(zip(snapshot_days, dates)):
+        # Main tool row (the page itself)
+        if main_rows is not None:
+            candidates.append((snapshot_day, date, *next(main_rows)))
+
+        # Expand the embedded tool lists
+        for items in payloads:
+            for item in items[i]:
+                candidates.append(
+                    (snapshot_day, date, *[pick(item, keys) for keys in item_keys])
+                )
 
-        df_chunk = pd.DataFrame(out)
+    return build_rows(candidates, source)
 
-        # Merge + dedupe WITH PANEL
-        panel = (
-            pd.concat([panel, df_chunk], ignore_index=True)
-            .sort_values(by=["views", "saves", "rating"], ascending=False, na_position="last")
-            .drop_duplicates(subset=["tool_id", "snapshot_day"], keep="first")
-        )
 
-        # 💾 Persist every chunk (important!)
-        panel = panel[FINAL_COLUMNS]
-        panel.to_csv(panel_path, index=False)
+def map_chunks(
+    jobs: list[tuple[CsvMapping, Path, str]],
+    chunksize: int = CHUNKSIZE,
+    desc: str | None = None,
+):
+    """
+    Run chunk_rows(chunk, mapping, source) over every chunk of each
+    (mapping, path, source) job on a process pool.
+    All jobs feed one pipeline, so the workers stay busy across file boundaries.
+    Results are yielded in job / file order, with at most 2 × WORKERS chunks in
+    flight so memory stays bounded while the consumer dedupes / writes.
+    """
+    chunks = (
+        (chunk, mapping, source)
+        for mapping, path, source in jobs
+        for chunk in read_chunks(path, chunksize, mapping.columns)
+    )
 
-        # 💨 free memory
-        del out, df_chunk
+    with tqdm(desc=desc, unit="row", disable=desc is None) as bar:
+        if WORKERS <= 1:
+            for chunk, mapping, source in chunks:
+                yield chunk_rows(chunk, mapping, source)
+                bar.update(len(chunk))
+            return
 
-def append_2023_to_panel(panel_path: Path, csv_2023: Path):
-    panel = pd.read_csv(panel_path)
+        with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+            pending = deque()
+            for chunk, mapping, source in chunks:
+                pending.append((len(chunk), pool.submit(chunk_rows, chunk, mapping, source)))
+                if len(pending) >= 2 * WORKERS:
+                    n, future = pending.popleft()
+                    yield future.result()
+                    bar.update(n)
 
-    for rows in process_csv_2023(csv_2023, source="2023"):
-        if not rows:
-            continue
+            while pending:
+                n, future = pending.popleft()
+                yield future.result()
+                bar.update(n)
 
-        df_2023 = pd.DataFrame(rows)
 
-        panel = (
-            pd.concat([panel, df_2023], ignore_index=True)
-            .sort_values(by=["views", "saves", "rating"], ascending=False, na_position="last")
-            .drop_duplicates(subset=["tool_id", "snapshot_day"], keep="first")
-        )
+# ----------------------------
+# Main processor
+# ----------------------------
+def process_csv_2024(path: Path, source: str) -> list[tuple]:
+    out = []
+    for rows in map_chunks([(MAPPING_2024, path, source)], desc=path.name):
+        out.extend(rows)
+    return out
 
-        panel = panel[FINAL_COLUMNS]
-        panel.to_csv(panel_path, index=False)
+def process_csv_2023(path: Path, source: str):
+    yield from map_chunks([(MAPPING_2023, path, source)])
 
-        del df_2023
+def append_2024_to_panel_streaming(
+    panel_path: Path,
+    csv_2024: Path,
+    chunksize: int = CHUNKSIZE
+):
+    """
+    Merge `csv_2024` into the panel at `panel_path`, checkpointing as it goes.
+    `chunksize` (rows) only applies without pyarrow; Arrow batches are sized
+    by READ_BLOCK_SIZE bytes instead (see read_chunks).
+    """
+    # Load existing panel ONCE, indexed by (tool_id, snapshot_day)
+    panel = load_panel(panel_path)
+
+    with BackgroundWriter() as writer:
+        chunks = map_chunks([(MAPPING_2024, csv_2024, "2024")], chunksize)
+        for n, out in enumerate(chunks, 1):
+            # Merge + dedupe WITH PANEL (only the incoming rows are touched)
+            merge_into_panel(panel, out)
+
+            # 💾 Checkpoint periodically (important!)
+            if n % CHECKPOINT_EVERY == 0:
+                writer.submit(write_panel, panel_rows(panel), panel_path)
+
+        writer.submit(write_panel, panel_rows(panel), panel_path)
 
-def process_csv(path: Path, source: str) -> list[dict]:
-    df = pd.read_csv(path)
-    out = []
+def append_2023_to_panel(panel_path: Path, csv_2023: Path):
+    panel = load_panel(panel_path)
 
-    for _, r in tqdm(df.iterrows(), total=len(df), desc=path.name):
-        snapshot_day, date = extract_snapshot_from_url(
-                r.get("link"),
-                r.get("internal_link"),
-                r.get("tool_link"),
-                r.get("external_link"),
-            )
+    with BackgroundWriter() as writer:
+        for n, rows in enumerate(process_csv_2023(csv_2023, source="2023"), 1):
+            merge_into_panel(panel, rows)
 
-        # Main tool row
-        row = build_row(
-            tool_name=r.get("name") or r.get("tool_name"),
-            internal_link=r.get("link") or r.get("internal_link"),
-            external_link=r.get("tool_link") or r.get("external_link"),
-            pricing_text=r.get("pricing_model") or r.get("price_text") or r.get("pricing_text"),
-            views=r.get("views"),
-            saves=r.get("saves"),
-            comments_count=extract_comments_count(r),
-            rating=r.get("rating"),
-            versions=r.get("versions"),
-            snapshot_day=snapshot_day,
-            date=date,
-            source=source,
-        )
+            if n % CHECKPOINT_EVERY == 0:
+                writer.submit(write_panel, panel_rows(panel), panel_path)
 
-        if row:
-            out.append(row)
-
-        # Expand alternatives
-        for col in ("top_alternative_json", "featured_items_json"):
-            for item in parse_json(r.get(col)):
-                alt = build_row(
-                    tool_name=item.get("name") or item.get("data_name"),
-                    internal_link=item.get("ai_page"),
-                    external_link=item.get("external_url") or item.get("data_url"),
-                    pricing_text=item.get("pricing") or item.get("price_text"),
-                    views=item.get("views"),
-                    saves=item.get("saves"),
-                    comments_count=None,
-                    rating=item.get("rating"),
-                    versions=None,
-                    snapshot_day=snapshot_day,
-                    date=date,
-                    source=source,
-                )
-                if alt:
-                    out.append(alt)
+        writer.submit(write_panel, panel_rows(panel), panel_path)
 
+def process_csv(path: Path, source: str) -> list[tuple]:
+    out = []
+    for rows in map_chunks([(MAPPING_DEFAULT, path, source)], desc=path.name):
+        out.extend(rows)
     return out
 
 
@@ -407,25 +758,17 @@ def process_csv(path: Path, source: str) -> list[dict]:
 # ----------------------------
 
 def build_panel(csv_inputs: dict[str, str], output_path: Path):
-    all_rows = []
-
-    for csv_path, source in csv_inputs.items():
-        all_rows.extend(process_csv(Path(csv_path), source))
+    panel = {}
 
-    df = pd.DataFrame(all_rows)
+    # Every input shares one worker pool; chunks still merge in input order,
+    # so ties keep resolving to the earlier file
+    jobs = [(MAPPING_DEFAULT, Path(csv_path), source) for csv_path, source in csv_inputs.items()]
 
     # Deduplicate: tool × snapshot
-    df = (
-        df.sort_values(
-            by=["views", "saves", "rating"],
-            ascending=False,
-            na_position="last",
-        )
-        .drop_duplicates(subset=["tool_id", "snapshot_day"], keep="first")
-    )
+    for rows in map_chunks(jobs, desc=output_path.name):
+        merge_into_panel(panel, rows)
 
-    df = df[FINAL_COLUMNS]
-    df.to_csv(output_path, index=False)
+    write_panel(panel_rows(panel), output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+import merge
+
+
+def cells(chunks) -> list[list]:
+    """Chunks as plain rows of str / None, whatever dtype each reader picked."""
+    df = pd.concat(list(chunks), ignore_index=True)
+    return [[None if pd.isna(v) else str(v) for v in row] for row in df.itertuples(index=False)]
+
+
+@unittest.skipIf(merge.pa is None, "pyarrow not installed")
+class ReadChunksTest(unittest.TestCase):
+    """The Arrow reader must see the same rows and missing cells as pandas."""
+
+    def read_both(self, text: str, **kwargs):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "in.csv"
+            path.write_text(text, encoding="utf-8")
+            arrow = cells(merge.read_chunks(path, **kwargs))
+            with mock.patch.object(merge, "pa", None):
+                c_parser = cells(merge.read_chunks(path, **kwargs))
+        return arrow, c_parser
+
+    def test_pandas_na_strings(self):
+        arrow, c_parser = self.read_both(
+            "link,name,tags,pricing\n"
+            "None,None,None,None\n"
+            "a,<NA>,free,None\n"
+            "b,NaN,,n/a\n"
+        )
+        self.assertEqual(arrow, c_parser)
+        self.assertEqual(arrow[0], [None] * 4)
+
+    def test_short_row(self):
+        body = "".join(f"l{i},n{i},t{i},p\n" for i in range(300))
+        with mock.patch.object(merge, "READ_BLOCK_SIZE", 1 << 10):
+            arrow, c_parser = self.read_both(
+                "link,name,tags,pricing\n" + body + "short,row\n" + body, chunksize=70
+            )
+        self.assertEqual(arrow, c_parser)
+        self.assertEqual(len(arrow), 601)
+
+
+class NormalizeUrlsTest(unittest.TestCase):
+    """normalize_urls' regex fast path must give exactly what normalize_url gives."""
+
+    LINKS = [
+        "http://Ex.com/a/", "HTTPS://x.y/b;p?q#f", " http://a.b/", "http://a.b\n/c", "http://a/b/\n",
+        "ftp://q/r/", "http:///p", "", "abc", "/", None, 5, "http://ä.com/x/",
+        "/web/20200101000000/https://Foo.COM/Bar/",
+        "https://web.archive.org/web/20210101000000/http://A.b/c?x",
+    ]
+    PREFIXES = [
+        "http://", "https://", "HtTp://", " https://", "",
+        "/web/20200101000000/http://", "/web/2020010100000\u0661/http://",
+    ]
+    # separators urlparse treats specially, whitespace, non-ASCII digits and case
+    ALPHABET = "aZ/:?#;@ .\t\n\r\x0b\x00-_%\u00e9\u00c9HhK0\u0661\u0662\u00a0\u212a"
+
+    def links(self) -> list:
+        rng = random.Random(1)
+        return self.LINKS + [
+            rng.choice(self.PREFIXES)
+            + "".join(rng.choice(self.ALPHABET) for _ in range(rng.randint(0, 15)))
+            for _ in range(20_000)
+        ]
+
+    def check(self):
+        links = self.links()
+        self.assertEqual(list(merge.normalize_urls(links)), [merge.normalize_url(v) for v in links])
+
+    @unittest.skipIf(merge.pa is None, "pyarrow not installed")
+    def test_arrow(self):
+        self.check()
+
+    def test_pandas(self):
+        with mock.patch.object(merge, "pa", None):
+            self.check()
+
+
+if __name__ == "__main__":
+    unittest.main()